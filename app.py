@@ -1,8 +1,13 @@
 import os
 import time
 import tempfile
+import shutil
+import inspect
+import hashlib
+import operator
+import contextlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import streamlit as st
-import pandas as pd
 import mimetypes
 import logging
 
@@ -23,22 +28,66 @@ _silence_network_logs()
 
 # logging suppression initialized at top
 
+# Page size for File Search list calls. 20 is the documented per-page maximum for both
+# fileSearchStores.list and documents.list, so larger values don't save round trips.
+FILE_SEARCH_PAGE_SIZE = 20
+
+# Default system instruction for the Ask tab (bug bounty program search); the question is appended per ask
+_SYS_PROMPT_PREFIX = (
+    "You are a specialized tool for verifying the existence and details of a bug bounty program based on the user's input. "
+    "**Strictly use the File Search tool on the provided vector store** to find a matching bug bounty program. Focus on org email, domain, url, company, org values. "
+    "If a match is found, extract the required details. "
+    "**Respond strictly in a single JSON object only**, with no explanations, extra text, or markdown formatting (e.g., no ```json ```). "
+    "The required fields are: "
+    "* **'Found'**: (string, 'Yes' or 'No') — Indicate if a bug bounty program was found for the input. "
+    "* **'Source'**: (string, the name or ID of the document/file in the vector store where the information was found, or 'N/A' if not found). "
+    "* **'Rewards'**: (string, 'Yes' or 'No') — Indicate if the program offers monetary or non-monetary rewards. "
+    "Example of expected output: {'Found': 'Yes', 'Source': 'vector_store_doc_123', 'Rewards': 'Yes'}"
+)
+
 # --- Helpers (top-level) ---
+# Fallback types for extensions the system mime database may not know about
+_COMMON_MIME_TYPES = {
+    ".md": "text/markdown",
+    ".txt": "text/plain",
+    ".csv": "text/csv",
+    ".json": "application/json",
+    ".pdf": "application/pdf",
+    ".html": "text/html",
+    ".xml": "application/xml",
+}
+
+# Streamlit re-executes this script on every rerun, so the mime database is loaded
+# (and the fallbacks registered) once per process; system entries win over the fallbacks
+@st.cache_resource(show_spinner=False)
+def _init_mimetypes():
+    if not mimetypes.inited:
+        mimetypes.init()
+    for ext, mime in _COMMON_MIME_TYPES.items():
+        if mimetypes.guess_type("file" + ext)[0] is None:
+            mimetypes.add_type(mime, ext)
+
+
+_init_mimetypes()
+
+
+# Extension -> mime memo that outlives reruns (a module-level lru_cache would be rebuilt each run)
+@st.cache_resource(show_spinner=False)
+def _mime_by_ext() -> dict:
+    return {}
+
+
+_MIME_BY_EXT = _mime_by_ext()
+
+
 def guess_mime(filename: str) -> str:
-    mime, _ = mimetypes.guess_type(filename)
-    if not mime:
-        ext = os.path.splitext(filename)[1].lower()
-        common = {
-            ".md": "text/markdown",
-            ".txt": "text/plain",
-            ".csv": "text/csv",
-            ".json": "application/json",
-            ".pdf": "application/pdf",
-            ".html": "text/html",
-            ".xml": "application/xml",
-        }
-        mime = common.get(ext)
-    return mime or "application/octet-stream"
+    ext = os.path.splitext(filename)[1].lower()
+    try:
+        mime = _MIME_BY_EXT[ext]
+    except KeyError:
+        mime = _MIME_BY_EXT[ext] = mimetypes.guess_type("file" + ext)[0]
+    # Suffix-only misses (e.g. "a.tar.gz") fall back to the full filename
+    return mime or mimetypes.guess_type(filename)[0] or "application/octet-stream"
 
 try:
     from google import genai
@@ -62,11 +111,39 @@ if genai is None:
     st.stop()
 
 # --- Helpers ---
+# Process-global: one client (and HTTP connection pool) per API key, shared across reruns.
+# Keep per-user state in st.session_state, never on the client. Bounded so that clients
+# built for mistyped/rejected keys on Connect don't live for the whole server process.
+@st.cache_resource(show_spinner=False, max_entries=32, ttl=3600)
 def get_client(api_key: str):
     """Initialize Gemini client using provided API key."""
     return genai.Client(api_key=api_key)
 
 
+def session_client(api_key_input: str):
+    """Return (client, api_key_fp) for the sidebar key, or (None, None) when it's blank.
+
+    The client and fingerprint are kept in session state, so reruns with an
+    unchanged key skip the strip/hash/cache lookup.
+    """
+    if "_client" in st.session_state and st.session_state.get("_api_key_input") == api_key_input:
+        return st.session_state["_client"], st.session_state["_api_key_fingerprint"]
+    api_key = api_key_input.strip()
+    if not api_key:
+        return None, None
+    client = get_client(api_key)
+    fingerprint = api_key_fingerprint(api_key)
+    st.session_state["_api_key_input"] = api_key_input
+    st.session_state["_api_key_fingerprint"] = fingerprint
+    st.session_state["_client"] = client
+    return client, fingerprint
+
+
+def _on_api_key_change():
+    # A new (possibly partial) key must be re-validated before any API calls
+    st.session_state["_api_key_validated"] = False
+
+
 def ensure_store_in_state(store):
     st.session_state["file_search_store"] = store
     st.session_state["file_search_store_name"] = store.name
@@ -79,49 +156,196 @@ def _safe_get(obj, attr, default=None):
         return default
 
 
-def list_stores(client):
+def api_key_fingerprint(api_key: str) -> str:
+    """Short digest of the API key used as a cache key, so the key itself is never cached."""
+    return hashlib.blake2b(api_key.encode(), digest_size=8).hexdigest()
+
+
+def _iter_pages(pager, items_attr: str):
+    """Yield items from an SDK list result, fetching further pages only as they're consumed."""
+    # google.genai Pager iterates across pages itself (next_page() returns a list, not a pager)
+    if hasattr(pager, "page"):
+        yield from pager
+    elif hasattr(pager, items_attr):
+        yield from getattr(pager, items_attr)
+    elif isinstance(pager, (list, tuple)):
+        yield from pager
+
+
+# Listings are cached per API key; the client arg is excluded from hashing (leading underscore).
+# Errors propagate so that failures are not cached. Call .clear() after any mutation.
+@st.cache_data(ttl=60, show_spinner=False)
+def list_stores_cached(_client, api_key_fp: str):
     """Return a list of File Search stores using the SDK pager if available."""
-    stores = []
+    pager = _client.file_search_stores.list(config={"page_size": FILE_SEARCH_PAGE_SIZE})
+    return list(_iter_pages(pager, "stores"))
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def list_store_documents_cached(_client, api_key_fp: str, store_name: str):
+    """Return a list of Documents within the given File Search store."""
+    pager = _client.file_search_stores.documents.list(parent=store_name, config={"page_size": FILE_SEARCH_PAGE_SIZE})
+    return list(_iter_pages(pager, "documents"))
+
+
+# Precompiled extractor for the document table columns
+_DOC_FIELD_NAMES = ("display_name", "name", "create_time", "update_time")
+_doc_fields = operator.attrgetter(*_DOC_FIELD_NAMES)
+
+
+def _doc_rows(docs):
+    """Return one dict per document with the _DOC_FIELD_NAMES columns."""
     try:
-        pager = client.file_search_stores.list(config={"page_size": 20})
-        # SDK may return a pager with .page/.has_next_page()/.next_page(), or a list-like
-        if hasattr(pager, "page"):
-            stores.extend(pager.page)
-            try:
-                while hasattr(pager, "has_next_page") and pager.has_next_page():
-                    pager = pager.next_page()
-                    stores.extend(getattr(pager, "page", []))
-            except Exception:
-                pass
-        elif hasattr(pager, "stores"):
-            stores = pager.stores
-        elif isinstance(pager, (list, tuple)):
-            stores = list(pager)
+        return [dict(zip(_DOC_FIELD_NAMES, _doc_fields(d))) for d in docs]
+    except Exception:
+        # Slow path for objects missing one of the attributes
+        return [{field: _safe_get(d, field, "") for field in _DOC_FIELD_NAMES} for d in docs]
+
+
+_store_fields = operator.attrgetter("display_name", "name")
+
+
+def _store_labels(stores_list):
+    """Return (labels, label_to_store, names) for the sidebar stores radio.
+
+    Memoized in session state against the stores_list object itself, so the
+    labels are only rebuilt after a refresh/create/delete replaces the list.
+    """
+    cached = st.session_state.get("_stores_labels_cache")
+    if cached is not None and cached[0] is stores_list:
+        return cached[1:]
+    try:
+        fields = [_store_fields(s) for s in stores_list]
+    except Exception:
+        # Slow path for objects missing one of the attributes
+        fields = [(_safe_get(s, "display_name", "(no display name)"), _safe_get(s, "name", "")) for s in stores_list]
+    labels = [f"{display_name} | {name}" for display_name, name in fields]
+    label_to_store = dict(zip(labels, stores_list))
+    names = [name for _, name in fields]
+    st.session_state["_stores_labels_cache"] = (stores_list, labels, label_to_store, names)
+    return labels, label_to_store, names
+
+
+def list_stores(client, api_key_fp: str):
+    """Cached store listing; reports failures in the sidebar and returns an empty list."""
+    try:
+        return list_stores_cached(client, api_key_fp)
     except Exception as e:
         st.sidebar.error(f"Failed to list stores: {e}")
-    return stores
+        return []
 
 
-def list_store_documents(client, store_name: str):
-    """Return a list of Documents within the given File Search store."""
-    docs = []
+def list_store_documents(client, api_key_fp: str, store_name: str):
+    """Cached document listing; reports failures inline and returns an empty list."""
     try:
-        pager = client.file_search_stores.documents.list(parent=store_name, config={"page_size": 20})
-        if hasattr(pager, "page"):
-            docs.extend(pager.page)
-            try:
-                while hasattr(pager, "has_next_page") and pager.has_next_page():
-                    pager = pager.next_page()
-                    docs.extend(getattr(pager, "page", []))
-            except Exception:
-                pass
-        elif hasattr(pager, "documents"):
-            docs = pager.documents
-        elif isinstance(pager, (list, tuple)):
-            docs = list(pager)
+        return list_store_documents_cached(client, api_key_fp, store_name)
     except Exception as e:
         st.error(f"Failed to list store files: {e}")
-    return docs
+        return []
+
+
+@st.cache_data(ttl=300, show_spinner="Querying Gemini...")
+def ask_gemini_cached(_client, api_key_fp: str, store_name: str, model_name: str, question: str, sys_prompt):
+    """Ask Gemini with File Search over store_name; identical asks within the TTL are served from cache."""
+    # Build the tool configuration referencing the File Search store
+    config = {
+        "tools": [
+            {"file_search": {"file_search_store_names": [store_name]}}
+        ],
+    }
+    if sys_prompt:
+        config["system_instruction"] = sys_prompt
+    return _client.models.generate_content(
+        model=model_name,
+        contents=question,
+        config=config,
+    )
+
+
+# Upper bounds on concurrent uploads/deletes so the store backend isn't throttled
+MAX_UPLOAD_WORKERS = 8
+MAX_DELETE_WORKERS = 5
+
+# Copy uploads in 1 MiB chunks so per-file overhead doesn't grow with file size
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+
+def poll_all_until_done(operations: dict, get_fn, initial=0.25, cap=4.0, factor=1.6):
+    """Poll many long-running operations from one thread.
+
+    Yields (key, operation, error) as each operation finishes. Every operation
+    keeps its own exponential backoff, and each tick only calls get_fn for the
+    operations whose next check is due.
+    """
+    pending = {}
+    for key, op in operations.items():
+        if getattr(op, "done", False):
+            yield key, op, None
+        else:
+            pending[key] = (op, time.monotonic() + initial, initial)
+    while pending:
+        next_due = min(due for _, due, _ in pending.values())
+        time.sleep(max(0.0, next_due - time.monotonic()))
+        now = time.monotonic()
+        for key, (op, due, delay) in list(pending.items()):
+            if due > now:
+                continue
+            try:
+                op = get_fn(op)
+            except Exception as e:
+                del pending[key]
+                yield key, None, e
+                continue
+            if getattr(op, "done", False):
+                del pending[key]
+                yield key, op, None
+            else:
+                delay = min(cap, delay * factor)
+                pending[key] = (op, time.monotonic() + delay, delay)
+
+
+# Probed once per process; the installed SDK can't change between reruns
+@st.cache_resource(show_spinner=False)
+def _sdk_accepts_file_objects() -> bool:
+    """Whether upload_to_file_search_store takes an open binary stream, not just a path."""
+    try:
+        from google.genai.file_search_stores import FileSearchStores
+        upload = FileSearchStores.upload_to_file_search_store
+        return "IOBase" in str(inspect.signature(upload).parameters["file"].annotation)
+    except Exception:
+        return False
+
+
+SDK_ACCEPTS_FILE_OBJECTS = _sdk_accepts_file_objects()
+
+
+def _upload_one(f, store_name: str, client, spill_path=None):
+    """Upload one UploadedFile into the store and start its import.
+
+    Streams from f, or first copies it to spill_path when given (for SDKs that
+    only take a path). Runs in a worker thread, so it must not call any
+    Streamlit APIs. Returns (display_name, mime_type, operation); raises on failure.
+    """
+    display_name = os.path.splitext(f.name)[0]
+    mime_type = guess_mime(f.name)
+    # Both paths read from the current position (the SDK measures size from tell()), so rewind first
+    f.seek(0)
+    if spill_path is None:
+        # Stream straight from the UploadedFile buffer; the SDK needs mime_type for streams
+        file_arg = f
+        config = {"display_name": display_name, "mime_type": mime_type}
+    else:
+        # Older SDKs only take a file path; the batch's temp directory is removed by the caller
+        with open(spill_path, "wb", buffering=UPLOAD_CHUNK_SIZE) as tmp:
+            shutil.copyfileobj(f, tmp, length=UPLOAD_CHUNK_SIZE)
+        file_arg = spill_path
+        config = {"display_name": display_name}
+    operation = client.file_search_stores.upload_to_file_search_store(
+        file=file_arg,
+        file_search_store_name=store_name,
+        config=config,
+    )
+    return display_name, mime_type, operation
 
 
 # --- Sidebar: API Key + Store selection ---
@@ -130,13 +354,28 @@ api_key_input = st.sidebar.text_input(
     "Google API Key",
     type="password",
     value="",
-    help="Paste your Google API key."
+    help="Paste your Google API key, then click Connect.",
+    key="_api_key",
+    on_change=_on_api_key_change,
 )
-effective_api_key = api_key_input.strip()
-if not effective_api_key:
+# Nothing below talks to the API until the key has been validated via Connect
+# The button stays enabled: pasting a key and clicking Connect commits the input in the same rerun
+connect_clicked = st.sidebar.button("Connect", use_container_width=True)
+if connect_clicked and not api_key_input.strip():
     st.sidebar.error("Missing API key. Enter your Google API key in the sidebar.")
+elif connect_clicked:
+    client, api_key_fp = session_client(api_key_input)
+    try:
+        # The first store page validates the key and primes the sidebar listing
+        st.session_state["stores_list"] = list_stores_cached(client, api_key_fp)
+        st.session_state["_api_key_validated"] = True
+    except Exception as e:
+        st.sidebar.error(f"Could not connect with this API key: {e}")
+if not st.session_state.get("_api_key_validated"):
+    if not connect_clicked:
+        st.sidebar.info("Enter your Google API key, then click 'Connect'.")
     st.stop()
-client = get_client(effective_api_key)
+client, api_key_fp = session_client(api_key_input)
 
 store_name_display = st.sidebar.text_input("File Search Store display name", value=st.session_state.get("file_search_store_display_name", "my-file-search-store"))
 
@@ -146,26 +385,23 @@ if st.sidebar.button("Create Store", use_container_width=True):
         store = client.file_search_stores.create(config={"display_name": store_name_display})
         st.success(f"Store created: {store.name}")
         # Refresh stores list so the newly created store appears
-        st.session_state["stores_list"] = list_stores(client)
+        list_stores_cached.clear()
+        st.session_state["stores_list"] = list_stores(client, api_key_fp)
     except Exception as e:
         st.error(f"Failed to create store: {e}")
 
 # NEW: Store listing & selection UI
 st.sidebar.markdown("### Stores")
 if st.sidebar.button("Refresh stores", use_container_width=True):
-    st.session_state["stores_list"] = list_stores(client)
+    list_stores_cached.clear()
+    st.session_state["stores_list"] = list_stores(client, api_key_fp)
 
 stores_list = st.session_state.get("stores_list", [])
 if stores_list:
     # Organize: list all stores, click to activate (turns green)
-    options_labels = [f"{_safe_get(s, 'display_name', '(no display name)')} | {_safe_get(s, 'name', '')}" for s in stores_list]
-    label_to_store = {options_labels[i]: stores_list[i] for i in range(len(options_labels))}
+    options_labels, label_to_store, store_names = _store_labels(stores_list)
     active_name = st.session_state.get("file_search_store_name", "")
-    default_idx = 0
-    for i, s in enumerate(stores_list):
-        if _safe_get(s, "name", "") == active_name:
-            default_idx = i
-            break
+    default_idx = store_names.index(active_name) if active_name in store_names else 0
     selected_label = st.sidebar.radio("Stores", options=options_labels, index=default_idx, key="stores_radio")
     selected_store = label_to_store.get(selected_label)
 
@@ -175,8 +411,6 @@ if stores_list:
         if sel_name and sel_name != active_name:
             ensure_store_in_state(selected_store)
             st.session_state["file_search_store_display_name"] = _safe_get(selected_store, "display_name", "")
-            st.session_state["store_documents"] = list_store_documents(client, sel_name)
-            st.session_state["_store_docs_for"] = sel_name
         st.sidebar.success(f"Active store: {sel_name}")
 
     # Delete active store (the currently selected one)
@@ -191,12 +425,15 @@ if stores_list:
                 st.sidebar.success(f"Deleted store: {store_to_delete_name}")
                 # Clear selection if this was the active store
                 if st.session_state.get("file_search_store_name") == store_to_delete_name:
-                    for k in ["file_search_store", "file_search_store_name", "store_documents", "_store_docs_for"]:
+                    for k in ["file_search_store", "file_search_store_name"]:
                         st.session_state.pop(k, None)
             except Exception as e1:
                 st.sidebar.error(f"Failed to delete store: {e1}")
             # Refresh stores list
-            st.session_state["stores_list"] = list_stores(client)
+            list_stores_cached.clear()
+            list_store_documents_cached.clear()
+            ask_gemini_cached.clear()
+            st.session_state["stores_list"] = list_stores(client, api_key_fp)
 else:
     st.sidebar.info("Click 'Refresh stores' to load available File Search stores.")
 
@@ -216,39 +453,24 @@ with tabs[0]:
 
         st.markdown(f"Current store: `{store_name}`")
 
-        # NEW: Auto-load docs for active store on first render or when store changes
-        if "store_documents" not in st.session_state or st.session_state.get("_store_docs_for") != store_name:
-            st.session_state["store_documents"] = list_store_documents(client, store_name)
-            st.session_state["_store_docs_for"] = store_name
-
-        # NEW: List files within the selected store
+        # NEW: List files within the selected store (served from the listing cache)
         with st.expander("Store files in this File Search store", expanded=True):
-            if st.button("Refresh store files"):
-                st.session_state["store_documents"] = list_store_documents(client, store_name)
-            docs = st.session_state.get("store_documents", [])
+            if st.button("Reload docs"):
+                list_store_documents_cached.clear()
+            docs = list_store_documents(client, api_key_fp, store_name)
+            st.caption("Listing may be up to a minute old. Click 'Reload docs' to fetch the latest.")
             if docs:
-                rows = []
-                for d in docs:
-                    rows.append({
-                        "display_name": _safe_get(d, "display_name", ""),
-                        "name": _safe_get(d, "name", ""),
-                        "create_time": _safe_get(d, "create_time", ""),
-                        "update_time": _safe_get(d, "update_time", ""),
-                    })
+                rows = _doc_rows(docs)
                 try:
-                    st.table(pd.DataFrame(rows))
+                    # st.dataframe takes the list of dicts directly; no pandas round trip
+                    st.dataframe(rows, use_container_width=True)
                 except Exception:
-                    # Fallback to JSON view if DataFrame construction fails
+                    # Fallback to JSON view if the table can't be rendered
                     st.json([getattr(d, "to_dict", lambda: str(d))() for d in docs])
 
                 # NEW: Document deletion controls
-                options_keys = [
-                    _safe_get(d, "name", "") for d in docs if _safe_get(d, "name", "")
-                ]
-                label_map = {
-                    _safe_get(d, "name", ""): f"{_safe_get(d, 'display_name', '(no display name)')} | {_safe_get(d, 'name', '')}"
-                    for d in docs
-                }
+                options_keys = [r["name"] for r in rows if r["name"]]
+                label_map = {r["name"]: f"{r['display_name']} | {r['name']}" for r in rows}
                 # Simplified deletion UI: either select all OR choose specific documents, then one delete action
                 select_all_docs = st.checkbox("Select all documents", key="_select_all_docs")
                 if select_all_docs:
@@ -267,23 +489,32 @@ with tabs[0]:
                     disabled=(not selected_doc_names)
                 )
                 if delete_docs_clicked and selected_doc_names:
-                    results = []
-                    for doc_name in selected_doc_names:
-                        try:
-                            client.file_search_stores.documents.delete(name=doc_name, config={"force": True})
-                            results.append({"document": doc_name, "status": "deleted"})
-                        except Exception as e1:
-                            results.append({"document": doc_name, "status": f"error: {e1}"})
-                    # Refresh documents list after deletion
-                    st.session_state["store_documents"] = list_store_documents(client, store_name)
+                    # The SDK has no batch delete, so fan the per-document deletes out instead
+                    statuses = {}
+                    with ThreadPoolExecutor(max_workers=min(MAX_DELETE_WORKERS, len(selected_doc_names))) as executor:
+                        futures = {
+                            executor.submit(client.file_search_stores.documents.delete, name=doc_name, config={"force": True}): doc_name
+                            for doc_name in selected_doc_names
+                        }
+                        for future in as_completed(futures):
+                            doc_name = futures[future]
+                            try:
+                                future.result()
+                                statuses[doc_name] = "deleted"
+                            except Exception as e1:
+                                statuses[doc_name] = f"error: {e1}"
+                    results = [{"document": doc_name, "status": statuses[doc_name]} for doc_name in selected_doc_names]
+                    # Refresh documents list and drop answers grounded on the old contents (on the next render)
+                    list_store_documents_cached.clear()
+                    ask_gemini_cached.clear()
                     st.success("Deletion attempted. See results below.")
                     with st.expander("Delete results"):
                         try:
-                            st.table(pd.DataFrame(results))
+                            st.table(results)
                         except Exception:
                             st.json(results)
             else:
-                st.write("No files listed yet. Click 'Refresh store files' to load documents.")
+                st.write("No files listed yet. Click 'Reload docs' to load documents.")
 
         # Uploaded files (this session) list removed per request
 
@@ -303,42 +534,49 @@ with tabs[0]:
             else:
                 results = []
                 for f in uploaded_files:
-                    try:
-                        # Save to a temporary file because SDK expects a file path
-                        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(f.name)[1]) as tmp:
-                            tmp.write(f.getbuffer())
-                            temp_path = tmp.name
-
-                        base_name = os.path.splitext(f.name)[0]
-                        display_name = base_name
-                        mime_type = guess_mime(f.name)
-                        st.write(f"Uploading to File Search store: {f.name} (detected mime: {mime_type})")
-                        st.write(f"Uploading & importing into File Search store: {store_name} (display name: {display_name})")
-                        operation = client.file_search_stores.upload_to_file_search_store(
-                            file=temp_path,
-                            file_search_store_name=store_name,
-                            config={"display_name": display_name},
-                        )
-
-                        # Poll until import is complete
-                        with st.spinner(f"Indexing {f.name} (polling operation status)..."):
-                            while not getattr(operation, "done", False):
-                                time.sleep(2)
-                                operation = client.operations.get(operation)
-
-                        results.append({"file": f.name, "display_name": display_name, "mime_type": mime_type, "status": "success"})
-
-                        st.success(f"Indexed: {f.name}")
-                    except Exception as e:
-                        results.append({"file": f.name, "display_name": display_name, "status": f"error: {e}"})
-
-                        st.error(f"Upload/import failed for {f.name}: {e}")
-                    finally:
-                        try:
-                            os.remove(temp_path)
-                        except Exception:
-                            pass
-
+                    st.write(f"Uploading to File Search store: {f.name} (detected mime: {guess_mime(f.name)})")
+                    st.write(f"Uploading & importing into File Search store: {store_name} (display name: {os.path.splitext(f.name)[0]})")
+                with st.spinner(f"Indexing {len(uploaded_files)} file(s) (polling operation status)..."):
+                    # Upload concurrently, then poll every pending import from this thread
+                    # Keyed by submit index: UploadedFile isn't hashable on older Streamlit releases
+                    operations = {}
+                    uploaded = {}
+                    # Path-only SDKs spill every file of the batch into one temp directory
+                    spill_dir = contextlib.nullcontext() if SDK_ACCEPTS_FILE_OBJECTS else tempfile.TemporaryDirectory()
+                    with spill_dir as tmp_dir, ThreadPoolExecutor(max_workers=min(MAX_UPLOAD_WORKERS, len(uploaded_files))) as executor:
+                        futures = {}
+                        for i, f in enumerate(uploaded_files):
+                            spill_path = os.path.join(tmp_dir, f"{i}{os.path.splitext(f.name)[1]}") if tmp_dir else None
+                            futures[executor.submit(_upload_one, f, store_name, client, spill_path)] = (i, f)
+                        for future in as_completed(futures):
+                            i, f = futures[future]
+                            try:
+                                display_name, mime_type, operation = future.result()
+                                uploaded[i] = (f, display_name, mime_type)
+                                operations[i] = operation
+                            except Exception as e:
+                                results.append({"file": f.name, "display_name": os.path.splitext(f.name)[0], "status": f"error: {e}"})
+
+                                st.error(f"Upload/import failed for {f.name}: {e}")
+
+                    for i, op, err in poll_all_until_done(operations, client.operations.get):
+                        f, display_name, mime_type = uploaded[i]
+                        # An import can finish (done=True) and still have failed
+                        if err is None:
+                            err = getattr(op, "error", None)
+                        if not err:
+                            results.append({"file": f.name, "display_name": display_name, "mime_type": mime_type, "status": "success"})
+
+                            st.success(f"Indexed: {f.name}")
+                        else:
+                            results.append({"file": f.name, "display_name": display_name, "status": f"error: {err}"})
+
+                            st.error(f"Upload/import failed for {f.name}: {err}")
+
+
+                # New documents: drop the cached listing and answers so the next render/ask refetches them
+                list_store_documents_cached.clear()
+                ask_gemini_cached.clear()
 
                 with st.expander("Batch results"):
                     st.table(results)
@@ -355,38 +593,13 @@ with tabs[1]:
         use_default_prompt = st.checkbox("Use default system prompt (Bug bounty program search)", value=True, help="When unchecked, the hardcoded system instruction is excluded.", key="_use_default_sys_prompt")
         ask = st.button("Ask")
 
-        if ask and question.strip():
+        q = question.strip()
+        if ask and q:
             try:
-                # Build the tool configuration referencing the File Search store and enforce JSON-only output
-                # Add system prompt per your requirement
-                sys_prompt = None
-                if use_default_prompt:
-                    sys_prompt = (
-                        """"You are a specialized tool for verifying the existence and details of a bug bounty program based on the user's input. "
-                            "**Strictly use the File Search tool on the provided vector store** to find a matching bug bounty program. Focus on org email, domain, url, company, org values. "
-                            "If a match is found, extract the required details. "
-                            "**Respond strictly in a single JSON object only**, with no explanations, extra text, or markdown formatting (e.g., no ```json ```). "
-                            "The required fields are: "
-                            "* **'Found'**: (string, 'Yes' or 'No') — Indicate if a bug bounty program was found for the input. "
-                            "* **'Source'**: (string, the name or ID of the document/file in the vector store where the information was found, or 'N/A' if not found). "
-                            "* **'Rewards'**: (string, 'Yes' or 'No') — Indicate if the program offers monetary or non-monetary rewards. "
-                            "Example of expected output: {'Found': 'Yes', 'Source': 'vector_store_doc_123', 'Rewards': 'Yes'}" """
-                        f"Input: {question.strip()}"
-                    )
+                # Add system prompt per your requirement (enforces JSON-only output)
+                sys_prompt = _SYS_PROMPT_PREFIX + f"\nInput: {q}" if use_default_prompt else None
 
-                config = {
-                    "tools": [
-                        {"file_search": {"file_search_store_names": [store_name]}}
-                    ],
-                }
-                if use_default_prompt:
-                    config["system_instruction"] = sys_prompt
-
-                response = client.models.generate_content(
-                    model=model_name,
-                    contents=question.strip(),
-                    config=config,
-                )
+                response = ask_gemini_cached(client, api_key_fp, store_name, model_name, q, sys_prompt)
 
                 # Display the response simply
                 st.markdown("### Answer")